@@ -1,25 +1,53 @@
 # -*- coding: utf-8 -*-
+import codecs
 import csv
+import functools
 import io
 import itertools
+import mmap
+import os
 import sys
-from collections import Iterable
 from collections import OrderedDict
 
 
-try:
-    callable  # Removed from 3.0 and 3.1, added back in 3.2.
-except NameError:
-    def callable(obj):
-        parent_types = type(obj).__mro__
-        return any('__call__' in typ.__dict__ for typ in parent_types)
+# Headers wider than this are handled with zip() instead of generated
+# code (compiling one statement per column gets slow for wide headers).
+_MAX_GENERATED_FIELDS = 256
 
-try:
-    string_types = basestring
-    file_types = (io.IOBase, file)
-except NameError:
-    string_types = str
-    file_types = io.IOBase
+
+def _make_row_factory(fieldnames):
+    """Return a function that takes a row with the same length as
+    *fieldnames* and returns an OrderedDict of its values.
+
+    The function's source is generated to assign each value with its
+    own statement. This avoids building a zip() iterator and a tuple
+    for every key-value pair. Fieldnames are passed in as closure
+    variables (rather than written into the source) so any type of
+    key can be used.
+    """
+    size = len(fieldnames)
+    if size > _MAX_GENERATED_FIELDS:
+        return lambda row: OrderedDict(zip(fieldnames, row))
+
+    keys = ['k{0}'.format(i) for i in range(size)]
+    lines = ['def outer({0}):'.format(', '.join(keys)),
+             '    def make_row(row):',
+             '        d = OrderedDict()']
+    for i, key in enumerate(keys):
+        lines.append('        d[{0}] = row[{1}]'.format(key, i))
+    lines.append('        return d')
+    lines.append('    return make_row')
+
+    namespace = {'OrderedDict': OrderedDict}
+    exec('\n'.join(lines), namespace)
+    return namespace['outer'](*fieldnames)
+
+
+# Readers for files with the same header share one row factory. Only
+# all-string headers are cached--other keys can be equal without being
+# the same type (1 == 1.0 == True) and the cached factory would return
+# rows with the wrong key objects.
+_cached_row_factory = functools.lru_cache(maxsize=64)(_make_row_factory)
 
 
 def _dict_generator(reader, fieldnames=None, restkey=None, restval=None):
@@ -29,131 +57,150 @@ def _dict_generator(reader, fieldnames=None, restkey=None, restval=None):
     iterator = iter(reader)
     if not fieldnames:
         fieldnames = next(iterator, [])
+    # Interning makes every row share the same key objects.
+    fieldnames = tuple(sys.intern(x) if type(x) is str else x
+                       for x in fieldnames)
+    lf = len(fieldnames)  # <- Loop invariant, get length once.
+    if all(type(x) is str for x in fieldnames):
+        make_row = _cached_row_factory(fieldnames)
+    else:
+        make_row = _make_row_factory(fieldnames)
 
+    # The short and long row handling below is adapted from the
+    # csv.DictReader class in the Python 3.6 Standard Library.
     for row in iterator:
-        if row == []:                          # This code is
-            continue                           # adapted from the
-        d = OrderedDict(zip(fieldnames, row))  # csv.DictReader
-        lf = len(fieldnames)                   # class in the
-        lr = len(row)                          # Python 3.6
-        if lf < lr:                            # Standard Library.
+        if not row:
+            continue  # <- Skip blank lines.
+        lr = len(row)
+        if lr == lf:
+            yield make_row(row)  # <- Common case.
+        elif lr > lf:
+            d = OrderedDict(zip(fieldnames, row))
             d[restkey] = row[lf:]
-        elif lf > lr:
+            yield d
+        else:
+            d = OrderedDict(zip(fieldnames, row))
             for key in fieldnames[lr:]:
                 d[key] = restval
-        yield d
+            yield d
 
 
 ########################################################################
 # CSV Reader.
 ########################################################################
-if sys.version_info[0] >= 3:
+def _from_csv_iterable(iterable, encoding, fieldnames=None, restkey=None,
+                       restval=None, **kwds):
+    # The *encoding* arg is not used but it's included so that
+    # all of the csv-helper functions have the same signature.
+    reader = csv.reader(iterable, **kwds)
+    return _dict_generator(reader, fieldnames, restkey, restval)
 
-    def _from_csv_iterable(iterable, encoding, fieldnames=None, restkey=None,
-                           restval=None, **kwds):
-        # The *encoding* arg is not used but it's included so that
-        # all of the csv-helper functions have the same signature.
-        return csv.DictReader(iterable, fieldnames, restkey, restval, **kwds)
 
+def _fast_csv_reader(lines):
+    """Accepts an iterator of lines and yields csv.reader-like rows
+    using the default dialect.
 
-    def _from_csv_path(path, encoding, fieldnames=None, restkey=None,
-                       restval=None, **kwds):
-        with open(path, 'rt', encoding=encoding, newline='') as f:
-            reader = csv.reader(f, **kwds)
-            for d in _dict_generator(reader, fieldnames, restkey, restval):
-                yield d
+    Lines are split directly on commas until the first line that
+    contains a quote character. Quoted fields can contain delimiters
+    and newlines, so the remaining lines are handed to csv.reader().
+    """
+    for line in lines:
+        if '"' in line:
+            break
+        line = line.rstrip('\r\n')
+        yield line.split(',') if line else []
+    else:
+        return  # <- EXIT! (Lines contain no quotes.)
 
-else:
-    import codecs
-
-    class UTF8Recoder(object):
-        """Iterator that reads an encoded stream and reencodes the
-        input to UTF-8.
-
-        This class is adapted from example code in Python 2.7 docs
-        for the csv module.
-        """
-        def __init__(self, f, encoding):
-            if isinstance(f, io.IOBase):
-                stream_reader = codecs.getreader(encoding)
-                self.reader = stream_reader(f)
-            elif isinstance(f, Iterable):
-                self.reader = (row.decode(encoding) for row in f)
-            else:
-                cls_name = f.__class__.__name__
-                raise TypeError('unsupported type {0}'.format(cls_name))
+    for row in csv.reader(itertools.chain([line], lines)):
+        yield row
 
-        def __iter__(self):
-            return self
 
-        def next(self):
-            return next(self.reader).encode('utf-8')
+# Characters that str.splitlines() treats as line boundaries but
+# which are not line boundaries in a file opened with newline=''.
+_NON_NEWLINE_BOUNDARIES = ('\x0b', '\x0c', '\x1c', '\x1d', '\x1e',
+                           '\x85', '\u2028', '\u2029')
 
 
-    class UnicodeReader(object):
-        """A CSV reader which will iterate over lines in the CSV
-        file *f*, which is encoded in the given encoding.
+def _iter_decoded_lines(read, encoding, size=65536):
+    """Calls *read* to get chunks of bytes, decodes them with the
+    given *encoding*, and yields lines of text. Lines are split
+    the same way as a file opened with ``newline=''``.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = []  # <- Pieces of a line that continues into the next chunk.
+    while True:
+        data = read(size)
+        final = not data
+        text = decoder.decode(data, final)
+        if any(char in text for char in _NON_NEWLINE_BOUNDARIES):
+            lines = io.StringIO(text, newline='').readlines()
+        else:
+            lines = text.splitlines(True)  # <- Faster when it's safe.
+
+        # Only the newly decoded text is scanned and split. Pending
+        # pieces are joined once, when their line has been completed.
+        if pending and lines:
+            first = lines[0]
+            if pending[-1].endswith('\r'):
+                # A pending '\r' ends the line unless it is the first
+                # half of a '\r\n' pair.
+                if first == '\n':
+                    pending.append(first)
+                    lines[0] = ''.join(pending)
+                else:
+                    lines.insert(0, ''.join(pending))
+                pending = []
+            elif first.endswith(('\n', '\r')):
+                pending.append(first)
+                lines[0] = ''.join(pending)
+                pending = []
+            else:
+                pending.append(first)  # <- Still no line boundary.
+                lines = []
 
-        This class is adapted from example code in Python 2.7 docs
-        for the csv module.
-        """
-        def __init__(self, f, dialect=csv.excel, encoding='utf-8', **kwds):
-            f = UTF8Recoder(f, encoding)
-            self.reader = csv.reader(f, dialect=dialect, **kwds)
+        if not final and lines and not lines[-1].endswith('\n'):
+            # The last line could be incomplete (or could end with a
+            # '\r' that is followed by '\n') so keep it for the next
+            # chunk.
+            pending = [lines.pop()]
 
-        @property
-        def line_num(self):
-            return self.reader.line_num
+        for line in lines:
+            yield line
 
-        @line_num.setter
-        def line_num(self, value):
-            self.reader.line_num = value
+        if final:
+            if pending:
+                yield ''.join(pending)
+            return  # <- EXIT!
 
-        def next(self):
-            row = next(self.reader)
-            return [unicode(s, 'utf-8') for s in row]
 
-        def __iter__(self):
-            return self
+def _from_csv_path(path, encoding, fieldnames=None, restkey=None,
+                   restval=None, **kwds):
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mapped = None  # <- Empty files and pipes can't be mapped.
 
+        if mapped is None:
+            read = f.read
+        else:
+            advice = getattr(mmap, 'MADV_SEQUENTIAL', None)
+            if advice is not None:
+                mapped.madvise(advice)  # <- Hint kernel to read ahead.
+            read = mapped.read
 
-    def _from_csv_iterable(iterable, encoding, fieldnames=None, restkey=None,
-                           restval=None, **kwds):
-        # Check that iterable is expected to return bytes (not strings).
         try:
-            if isinstance(iterable, file):
-                assert 'b' in iterable.mode
-            elif isinstance(iterable, io.IOBase):
-                assert not isinstance(iterable, io.TextIOBase)
+            lines = _iter_decoded_lines(read, encoding)
+            if kwds:
+                reader = csv.reader(lines, **kwds)
             else:
-                pass
-                # If *iterable* is a generic iterator, we just have to
-                # trust that the user knows what they're doing. Because
-                # in Python 2, there's no reliable way to tell the
-                # difference between encoded bytes and decoded strings:
-                #
-                #   >>> b'x' == 'x'
-                #   True
-                #
-        except AssertionError:
-            msg = ('Python 2 unicode compatibility expects bytes, not '
-                   'strings (did you open the file in binary mode?)')
-            raise TypeError(msg)
-
-        # Create an empty csv.DictReader---by default, it contains
-        # a non-unicode csv.reader internally. Then, replace its
-        # internal reader with a unicode-compatible one.
-        dict_reader = csv.DictReader([], fieldnames, restkey, restval)
-        dict_reader.reader = UnicodeReader(iterable, encoding=encoding, **kwds)
-        return dict_reader
-
-
-    def _from_csv_path(path, encoding, fieldnames=None, restkey=None,
-                       restval=None, **kwds):
-        with io.open(path, 'rb') as f:
-            reader = UnicodeReader(f, encoding=encoding, **kwds)
+                reader = _fast_csv_reader(lines)
             for d in _dict_generator(reader, fieldnames, restkey, restval):
                 yield d
+        finally:
+            if mapped is not None:
+                mapped.close()
 
 
 def from_csv(csvfile, encoding='utf-8', fieldnames=None, **kwds):
@@ -161,7 +208,7 @@ def from_csv(csvfile, encoding='utf-8', fieldnames=None, **kwds):
     iterate over lines in the given data. The *csvfile* can be a file
     path (a string) or any object supported by the csv.reader function.
     """
-    if isinstance(csvfile, string_types):
+    if isinstance(csvfile, str):
         return _from_csv_path(csvfile, encoding, fieldnames, **kwds)
     return _from_csv_iterable(csvfile, encoding, fieldnames, **kwds)
 
@@ -179,36 +226,59 @@ def from_pandas(df, index=True):
     else:
         fieldnames = list(df.columns)
 
-    records = df.to_records(index=index)
-    for record in records:
-        yield OrderedDict(zip(fieldnames, record))
+    # Values are converted to Python objects one column at a time
+    # (rather than one cell at a time). This is done in chunks of
+    # rows to limit the amount of memory used for large DataFrames.
+    chunksize = 10000
+    for start in range(0, len(df), chunksize):
+        chunk = df.iloc[start:start + chunksize]
+        columns = [chunk.iloc[:, i].tolist() for i in range(chunk.shape[1])]
+        if index:
+            chunk_index = chunk.index
+            levels = range(chunk_index.nlevels)
+            index_columns = [chunk_index.get_level_values(i).tolist()
+                             for i in levels]
+            columns = index_columns + columns
+
+        for record in zip(*columns):
+            yield OrderedDict(zip(fieldnames, record))
 
 
 ########################################################################
 # MS Excel Reader.
 ########################################################################
-def from_excel(path, worksheet=0):
-    """Returns a generator that operates like a csv.DictReader---it
-    yields rows as OrderedDict objects whose keys are derived from
-    values in the first row of the specified *worksheet*.
+def _from_xlsx(path, worksheet):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportError(
+            "No module named 'openpyxl'\n"
+            "\n"
+            "This is an optional constructor that requires the "
+            "third-party library 'openpyxl'."
+        )
 
-    The given *path* must specify an XLSX or XLS file and *worksheet*
-    must specify the index or name of the worksheet to load (defaults
-    to the first worksheet).
+    # In read-only mode, rows are streamed from the worksheet XML
+    # rather than loading the entire workbook into memory.
+    book = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        if isinstance(worksheet, int):
+            sheet = book.worksheets[worksheet]
+        else:
+            sheet = book[worksheet]
+        data = sheet.iter_rows(values_only=True)
 
-    Load first worksheet::
+        # Empty cells are None in openpyxl, use '' to match xlrd.
+        data = (['' if x is None else x for x in row] for row in data)
 
-        source = from_excel('somefile.xlsx')
+        for d in _dict_generator(data):
+            yield d
 
-    Specific worksheets can be loaded by name (a string) or
-    index (an integer)::
+    finally:
+        book.close()
 
-        source = from_excel('somefile.xlsx', 'Sheet 2')
 
-    .. note::
-        This function requires the optional, third-party
-        package `xlrd <https://pypi.python.org/pypi/xlrd>`_.
-    """
+def _from_xls(path, worksheet):
     try:
         import xlrd
     except ImportError:
@@ -234,6 +304,40 @@ def from_excel(path, worksheet=0):
         book.release_resources()
 
 
+def from_excel(path, worksheet=0):
+    """Returns a generator that operates like a csv.DictReader---it
+    yields rows as OrderedDict objects whose keys are derived from
+    values in the first row of the specified *worksheet*.
+
+    The given *path* must specify an XLSX or XLS file and *worksheet*
+    must specify the index or name of the worksheet to load (defaults
+    to the first worksheet).
+
+    Load first worksheet::
+
+        source = from_excel('somefile.xlsx')
+
+    Specific worksheets can be loaded by name (a string) or
+    index (an integer)::
+
+        source = from_excel('somefile.xlsx', 'Sheet 2')
+
+    Empty cells are loaded as empty strings (``''``) for both file
+    types. Date cells in XLSX files are loaded as ``datetime`` objects
+    but in XLS files, they are loaded as float serial numbers (which
+    is how xlrd reads them).
+
+    .. note::
+        This function requires the optional, third-party packages
+        `openpyxl <https://pypi.python.org/pypi/openpyxl>`_ (for XLSX
+        files) or `xlrd <https://pypi.python.org/pypi/xlrd>`_ (for XLS
+        files).
+    """
+    if os.fspath(path).lower().endswith('.xlsx'):
+        return _from_xlsx(path, worksheet)
+    return _from_xls(path, worksheet)
+
+
 ########################################################################
 # DBF Reader.
 ########################################################################
@@ -266,7 +370,7 @@ def from_dbf(filename, encoding=None, **kwds):
 ########################################################################
 def get_reader(obj, *args, **kwds):
     """Returns a csv.DictReader or a DictReader-like iterator."""
-    if isinstance(obj, string_types):
+    if isinstance(obj, str):
         lowercase = obj.lower()
         if lowercase.endswith('.csv'):
             return from_csv(obj, *args, **kwds)
@@ -276,7 +380,7 @@ def get_reader(obj, *args, **kwds):
             return from_dbf(obj, *args, **kwds)
 
     else:
-        if isinstance(obj, file_types) \
+        if isinstance(obj, io.IOBase) \
                 and getattr(obj, 'name', '').lower().endswith('.csv'):
             return from_csv(obj, *args, **kwds)
 
@@ -3,14 +3,22 @@
 import csv
 import io
 import os
-import sys
+import shutil
+import tempfile
+import time
 import unittest
+from collections import OrderedDict
 
 try:
     import pandas
 except ImportError:
     pandas = None
 
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
 try:
     import xlrd
 except ImportError:
@@ -23,6 +31,8 @@ except ImportError:
 
 
 from get_reader import _dict_generator
+from get_reader import _fast_csv_reader
+from get_reader import _iter_decoded_lines
 from get_reader import _from_csv_iterable
 from get_reader import _from_csv_path
 #from get_reader import from_csv
@@ -32,30 +42,11 @@ from get_reader import from_dbf
 from get_reader import get_reader
 
 
-PY2 = sys.version_info[0] == 2
-
-
-try:
-    chr = unichr
-except NameError:
-    pass
-
-try:
-    FileNotFoundError
-except NameError:
-    FileNotFoundError = IOError
-
-
 def get_stream(string, encoding=None):
-    """Test-helper to return file-like object for *string* data.
-
-    In Python 2, Unicode files should be opened in binary-mode but
-    in Python 3, they should be opened in text-mode. This function
-    emulates the appropriate mode using the file-like stream objects.
+    """Test-helper to return a text-mode file-like object for
+    *string* data.
     """
     fh = io.BytesIO(string)
-    if PY2:
-        return fh
     return io.TextIOWrapper(fh, encoding=encoding)
 
 
@@ -74,14 +65,60 @@ class TestDictGenerator(unittest.TestCase):
         dict_reader = csv.DictReader(iterable)  # <- Reference implementation.
         self.assertEqual(list(generator), list(dict_reader))
 
+    def test_nonstring_and_duplicate_fieldnames(self):
+        data = [['a', 1.5, None, 'a'], ['x', 'y', 'z', 'w']]
+        generator = _dict_generator(data)
+        expected = [OrderedDict(zip(data[0], data[1]))]
+        self.assertEqual(list(generator), expected)
 
-class TestFromCsvIterable(unittest.TestCase):
-    """Test Unicode CSV support.
+    def test_wide_header(self):
+        """Very wide headers should not be slow to set up."""
+        fieldnames = ['col{0}'.format(i) for i in range(50000)]
+        row = [str(i) for i in range(50000)]
 
-    Calling _from_csv_iterable() on Python 2 uses the UnicodeReader
-    and UTF8Recoder classes internally for consistent behavior across
-    versions.
-    """
+        start = time.perf_counter()
+        generator = _dict_generator([fieldnames, row])
+        self.assertEqual(list(generator), [OrderedDict(zip(fieldnames, row))])
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+class TestFastCsvReader(unittest.TestCase):
+    def test_unquoted(self):
+        lines = ['col1,col2\r\n', '1,a\r\n', '\r\n', '2,b,x\n', '3']
+        reader = _fast_csv_reader(iter(lines))
+        self.assertEqual(list(reader), list(csv.reader(lines)))
+
+    def test_quoted(self):
+        """Once a quote is seen, lines should be parsed by csv.reader."""
+        lines = ['col1,col2\r\n', '1,"a,b"\r\n', '2,"c\r\n', 'd"\r\n', '3,e']
+        reader = _fast_csv_reader(iter(lines))
+        self.assertEqual(list(reader), list(csv.reader(lines)))
+
+
+class TestIterDecodedLines(unittest.TestCase):
+    def test_chunk_boundaries(self):
+        """Lines should match a text stream opened with newline=''
+        regardless of where the chunks are split.
+        """
+        text = 'a,b\r\n1,"x\ry"\r\n2,\xe6\x0c\r3,\u2028\n4'
+        expected = io.StringIO(text, newline='').readlines()
+        for encoding in ('utf-8', 'utf-16'):
+            for size in (1, 2, 3, 64):
+                stream = io.BytesIO(text.encode(encoding))
+                lines = _iter_decoded_lines(stream.read, encoding, size)
+                self.assertEqual(list(lines), expected)
+
+    def test_long_lines(self):
+        """Lines that span many chunks should be joined correctly."""
+        text = ('x' * 1000) + '\r' + ('y' * 1000) + '\r\n' + ('z' * 1000)
+        expected = io.StringIO(text, newline='').readlines()
+        stream = io.BytesIO(text.encode('utf-8'))
+        lines = _iter_decoded_lines(stream.read, 'utf-8', size=7)
+        self.assertEqual(list(lines), expected)
+
+
+class TestFromCsvIterable(unittest.TestCase):
+    """Test Unicode CSV support."""
     def test_ascii(self):
         stream = get_stream((
             b'col1,col2\n'
@@ -137,16 +174,10 @@ class TestFromCsvIterable(unittest.TestCase):
             b'2,b\n'
             b'3,c\n'
         )
-        if PY2:
-            bytes_stream = io.BytesIO(bytes_literal)
-            text_stream = io.TextIOWrapper(bytes_stream, encoding='ascii')
-            with self.assertRaises(TypeError):
-                reader = _from_csv_iterable(text_stream, 'ascii')
-        else:
-            bytes_stream = io.BytesIO(bytes_literal)
-            with self.assertRaises((csv.Error, TypeError)):
-                reader = _from_csv_iterable(bytes_stream, 'ascii')
-                list(reader)  # Trigger evaluation.
+        bytes_stream = io.BytesIO(bytes_literal)
+        with self.assertRaises((csv.Error, TypeError)):
+            reader = _from_csv_iterable(bytes_stream, 'ascii')
+            list(reader)  # Trigger evaluation.
 
     def test_empty_file(self):
         stream = get_stream(b'', encoding='ascii')
@@ -170,6 +201,21 @@ class TestFromCsvPath(unittest.TestCase):
         ]
         self.assertEqual(list(reader), expected)
 
+    def test_quoted_newlines(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'quoted.csv')
+        with open(path, 'wb') as f:
+            f.write(b'col1,col2\r\n1,a\r\n2,"b\r\nc"\r\n3,d\r\n')
+
+        reader = _from_csv_path(path, encoding='ascii')
+        expected = [
+            {'col1': '1', 'col2': 'a'},
+            {'col1': '2', 'col2': 'b\r\nc'},
+            {'col1': '3', 'col2': 'd'},
+        ]
+        self.assertEqual(list(reader), expected)
+
     def test_file_not_found(self):
         with self.assertRaises(FileNotFoundError):
             reader = _from_csv_path('missing_file.csv', encoding='iso8859-1')
@@ -242,7 +288,7 @@ class TestFromPandas(unittest.TestCase):
         self.assertEqual(list(reader), expected)
 
 
-@unittest.skipIf(not xlrd, 'xlrd not found')
+@unittest.skipIf(not openpyxl, 'openpyxl not found')
 class TestFromExcel(unittest.TestCase):
     def setUp(self):
         dirname = os.path.dirname(__file__)
@@ -268,6 +314,36 @@ class TestFromExcel(unittest.TestCase):
         ]
         self.assertEqual(list(reader), expected)
 
+    def test_path_like(self):
+        import pathlib
+        reader = from_excel(pathlib.Path(self.filepath))
+
+        expected = [
+            {'col1': 1, 'col2': 'a'},
+            {'col1': 2, 'col2': 'b'},
+            {'col1': 3, 'col2': 'c'},
+        ]
+        self.assertEqual(list(reader), expected)
+
+    def test_empty_cells(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        filepath = os.path.join(tmpdir, 'empty_cells.xlsx')
+
+        book = openpyxl.Workbook()
+        sheet = book.active
+        sheet.append(['col1', 'col2'])
+        sheet.append([1, None])
+        sheet.append([None, 'b'])
+        book.save(filepath)
+
+        reader = from_excel(filepath)
+        expected = [
+            {'col1': 1, 'col2': ''},
+            {'col1': '', 'col2': 'b'},
+        ]
+        self.assertEqual(list(reader), expected)
+
 
 @unittest.skipIf(not dbfread, 'dbfread not found')
 class TestFromDbf(unittest.TestCase):
@@ -306,10 +382,7 @@ class TestFunctionDispatching(unittest.TestCase):
 
         path = 'sample_text_utf8.csv'
         encoding = 'utf-8'
-        if PY2:
-            fh = io.open(path, 'rb')
-        else:
-            fh = open(path, 'rt', encoding=encoding, newline='')
+        fh = open(path, 'rt', encoding=encoding, newline='')
 
         with fh:
             reader = get_reader(fh, encoding=encoding)
@@ -318,14 +391,16 @@ class TestFunctionDispatching(unittest.TestCase):
             ]
             self.assertEqual(list(reader), expected)
 
-    @unittest.skipIf(not xlrd, 'xlrd not found')
-    def test_excel(self):
+    @unittest.skipIf(not openpyxl, 'openpyxl not found')
+    def test_excel2007(self):
         reader = get_reader('sample_excel2007.xlsx')
         expected = [
             {'col1': 'excel2007', 'col2': 1},
         ]
         self.assertEqual(list(reader), expected)
 
+    @unittest.skipIf(not xlrd, 'xlrd not found')
+    def test_excel1997(self):
         reader = get_reader('sample_excel1997.xls')
         expected = [
             {'col1': 'excel1997', 'col2': 1},
@@ -1,35 +1,33 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-import abc
+import operator
 import re
+import sys
+import types
+import weakref
+from collections.abc import Set
+from functools import partial
 from math import isnan
 
-try:
-    abc.ABC  # New in version 3.4.
-except AttributeError:
-    _ABC = abc.ABCMeta('ABC', (object,), {})  # <- Using Python 2 and 3
-                                          #    compatible syntax.
-    abc.ABC = _ABC
+regex_types = getattr(re, 'Pattern', None) or type(re.compile(''))
 
-regex_types = type(re.compile(''))
 
-try:
-    callable  # Removed from 3.0 and 3.1, added back in 3.2.
-except NameError:
-    def callable(obj):
-        parent_types = type(obj).__mro__
-        return any('__call__' in typ.__dict__ for typ in parent_types)
+class MatcherBase(object):
+    """Base class for objects that implement rich predicate matching.
+    Subclasses should define a user-readable __repr__() method.
+    """
+    __slots__ = ()
 
 
-class MatcherBase(abc.ABC):
-    """Base class for objects that implement rich predicate matching."""
-    @abc.abstractmethod
-    def __repr__(self):
-        return super(MatcherBase, self).__repr__()
+class MatcherObject(MatcherBase):
+    """Wrapper to call *function* when evaluating the '==' operator.
 
+    Matchers are hashed by identity only. Because '==' tests for a
+    match (not equality), no hash can agree with it--so in sets and
+    dicts, a matcher is only found by looking up the matcher itself.
+    """
+    __slots__ = ('_func', '_repr')
 
-class MatcherObject(MatcherBase):
-    """Wrapper to call *function* when evaluating the '==' operator."""
     def __init__(self, function, repr_string):
         self._func = function
         self._repr = repr_string
@@ -37,8 +35,7 @@ class MatcherObject(MatcherBase):
     def __eq__(self, other):
         return self._func(other)
 
-    def __ne__(self, other):  # <- For Python 2.x compatibility.
-        return not self.__eq__(other)
+    __hash__ = object.__hash__
 
     def __repr__(self):
         return self._repr
@@ -47,15 +44,39 @@ class MatcherObject(MatcherBase):
 class MatcherTuple(MatcherBase, tuple):
     """Wrapper to mark tuples that contain one or more MatcherObject
     instances.
+
+    Unlike normal tuple comparison, elements are not compared from
+    left to right. Cheaper checks (plain values, sets, etc.) are made
+    before regex searches and callables, and comparison stops at the
+    first mismatch. So which elements get checked--and which of their
+    side effects or exceptions occur--can differ from a comparison
+    made with tuple.__eq__().
     """
-    pass
+    def __new__(cls, iterable=()):
+        self = super(MatcherTuple, cls).__new__(cls, iterable)
+        self._eq = _make_tuple_eq(self)
+        return self
+
+    def __eq__(self, other):
+        return self._eq(other)
+
+    def __ne__(self, other):
+        result = self._eq(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = tuple.__hash__
+
+    def __reduce__(self):
+        return (self.__class__, (tuple(self),))
 
 
 def _check_type(type_, value):
     """Return true if *value* is an instance of the specified type
     or if *value* is the specified type.
     """
-    return value is type_ or isinstance(value, type_)
+    return isinstance(value, type_) or value is type_
 
 
 def _check_callable(func, value):
@@ -70,14 +91,10 @@ def _check_wildcard(value):
     return True
 
 
-def _check_truthy(value):
-    """Return true if *value* is truthy."""
-    return bool(value)
-
-
-def _check_falsy(value):
-    """Return true if *value* is falsy."""
-    return not bool(value)
+# Return true if *value* is truthy (or falsy). These are the builtin
+# functions themselves, so no extra Python frame is needed.
+_check_truthy = bool
+_check_falsy = operator.not_
 
 
 def _check_nan(value):
@@ -96,14 +113,144 @@ def _check_regex(regex, value):
         return value is regex
 
 
+def _check_str_regex(regex, value):
+    """Same as _check_regex() but for patterns compiled from a str.
+    Only str values can match these patterns so other types are
+    checked up front rather than by catching a TypeError.
+    """
+    if not isinstance(value, str):
+        return value is regex
+    return regex.search(value) is not None
+
+
 def _check_set(set_, value):
     """Return true if *value* is a member of the given set or if
     the *value* is equal to the given set.
     """
     try:
-        return value in set_ or value == set_
+        if value in set_:
+            return True  # <- EXIT!
     except TypeError:
-        return False
+        if not isinstance(value, Set):
+            return False  # <- EXIT! (Unhashable, can't be a member.)
+    return isinstance(value, Set) and value == set_
+
+
+def _type_parts(obj):
+    pred_handler = partial(_check_type, obj)
+    return pred_handler, getattr(obj, '__name__', repr(obj))
+
+
+def _callable_parts(obj):
+    pred_handler = partial(_check_callable, obj)
+    return pred_handler, getattr(obj, '__name__', repr(obj))
+
+
+def _function_parts(obj):
+    return _callable_parts(obj)  # <- Separate handler so it's cacheable.
+
+
+def _wildcard_parts(obj):
+    return _check_wildcard, '...'  # <- Matches everything.
+
+
+def _bool_parts(obj):
+    if obj:
+        return _check_truthy, 'True'
+    return _check_falsy, 'False'
+
+
+def _float_parts(obj):
+    if isnan(obj):
+        return _check_nan, "float('nan')"
+    return None
+
+
+def _regex_parts(obj, module='re'):
+    if isinstance(obj.pattern, str):
+        pred_handler = partial(_check_str_regex, obj)
+    else:
+        pred_handler = partial(_check_regex, obj)  # <- Bytes-like values.
+    repr_string = '{0}.compile({1!r})'.format(module, obj.pattern)
+    return pred_handler, sys.intern(repr_string)
+
+
+def _set_parts(obj):
+    pred_handler = partial(_check_set, obj)
+    return pred_handler, repr(obj)
+
+
+def _no_parts(obj):
+    return None
+
+
+def _get_matcher_parts_slow(obj):
+    """Handle objects whose exact type is not in _parts_handlers
+    (subclasses, user-defined callables, etc.).
+    """
+    if isinstance(obj, (set, frozenset)):
+        return _set_parts(obj)
+    if 'regex' in sys.modules:
+        # Patterns from the third-party "regex" package have the same
+        # search() interface. They're only checked for if the package
+        # has already been imported (and if it's a version that has a
+        # Pattern type--any other module named "regex" is ignored).
+        pattern_type = getattr(sys.modules['regex'], 'Pattern', None)
+        if pattern_type is not None and isinstance(obj, pattern_type):
+            return _regex_parts(obj, 'regex')
+    if isinstance(obj, type):
+        return _type_parts(obj)  # <- Must precede callable() check.
+    if callable(obj):
+        return _callable_parts(obj)
+    if isinstance(obj, Set):
+        return _set_parts(obj)  # <- Other set types (dict keys, etc.).
+    if _check_nan(obj):
+        return _check_nan, "float('nan')"  # <- Last, usually raises.
+    return None
+
+
+# Map exact types to the functions that build their matcher parts.
+# This replaces a chain of isinstance() checks with a single dict
+# lookup for the most common kinds of objects. The bool, ellipsis,
+# and regex types can not be subclassed so their handlers are only
+# reached through this dict.
+_parts_handlers = {
+    type: _type_parts,
+    types.FunctionType: _function_parts,
+    types.BuiltinFunctionType: _callable_parts,
+    types.MethodType: _callable_parts,
+    partial: _callable_parts,
+    type(Ellipsis): _wildcard_parts,
+    bool: _bool_parts,
+    float: _float_parts,
+    regex_types: _regex_parts,
+    set: _set_parts,
+    frozenset: _set_parts,
+    str: _no_parts,
+    bytes: _no_parts,
+    int: _no_parts,
+    type(None): _no_parts,
+}
+
+
+# Parts for types, functions, and compiled regexes are cached by
+# object identity while a matcher that uses them is still alive. The
+# cache only holds a weak reference to each handler (the handler holds
+# the object itself) so cached objects can still be garbage collected.
+# A live handler also means its object is alive, so the object's id()
+# can not be reused while its entry is valid. Sets are not cached
+# because they are mutable (their repr string could go stale). Bound
+# methods and partials are not cached because they are usually new
+# objects each time (so the cache would never be hit).
+_parts_cache = {}
+_cacheable_handlers = (_type_parts, _function_parts, _regex_parts)
+
+
+def _discard_parts(key, handler_ref):
+    """Weakref callback to remove a dead entry from _parts_cache."""
+    cached = _parts_cache.get(key)
+    if cached is not None and cached[0] is handler_ref:
+        del _parts_cache[key]
 
 
 def _get_matcher_parts(obj):
@@ -112,43 +259,217 @@ def _get_matcher_parts(obj):
     value). Return None if *obj* can be matched with the "==" operator
     and requires no other special handling.
     """
-    if isinstance(obj, type):
-        pred_handler = lambda x: _check_type(obj, x)
-        repr_string = getattr(obj, '__name__', repr(obj))
-    elif callable(obj):
-        pred_handler = lambda x: _check_callable(obj, x)
-        repr_string = getattr(obj, '__name__', repr(obj))
-    elif obj is Ellipsis:
-        pred_handler = _check_wildcard  # <- Matches everything.
-        repr_string = '...'
-    elif obj is True:
-        pred_handler = _check_truthy
-        repr_string = 'True'
-    elif obj is False:
-        pred_handler = _check_falsy
-        repr_string = 'False'
-    elif _check_nan(obj):
-        pred_handler = _check_nan
-        repr_string = "float('nan')"
-    elif isinstance(obj, regex_types):
-        pred_handler = lambda x: _check_regex(obj, x)
-        repr_string = 're.compile({0!r})'.format(obj.pattern)
-    elif isinstance(obj, set):
-        pred_handler = lambda x: _check_set(obj, x)
-        repr_string = repr(obj)
-    else:
-        return None
+    cached = _parts_cache.get(id(obj))
+    if cached is not None:
+        pred_handler = cached[0]()
+        if pred_handler is not None:
+            return pred_handler, cached[1]  # <- EXIT!
+
+    handler = _parts_handlers.get(type(obj), _get_matcher_parts_slow)
+    parts = handler(obj)
+    if handler in _cacheable_handlers:
+        key = id(obj)
+        handler_ref = weakref.ref(parts[0], partial(_discard_parts, key))
+        _parts_cache[key] = (handler_ref, parts[1])
+    return parts
+
+
+class _WildcardMatcher(MatcherObject):
+    """MatcherObject for the Ellipsis wildcard (matches everything)."""
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return True
 
-    return pred_handler, repr_string
+    __hash__ = object.__hash__
+
+
+class _TruthyMatcher(MatcherObject):
+    """MatcherObject for True (matches truthy values)."""
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return bool(other)
+
+    __hash__ = object.__hash__
+
+
+class _FalsyMatcher(MatcherObject):
+    """MatcherObject for False (matches falsy values)."""
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return not other
+
+    __hash__ = object.__hash__
+
+
+# These matchers have no state so a single instance of each is shared.
+# Their __eq__() methods are written out directly to avoid calling the
+# handler function through the "_func" attribute on every comparison.
+_singleton_matchers = {
+    _check_wildcard: _WildcardMatcher(_check_wildcard, '...'),
+    _check_truthy: _TruthyMatcher(_check_truthy, 'True'),
+    _check_falsy: _FalsyMatcher(_check_falsy, 'False'),
+}
 
 
 def _get_matcher_or_original(obj):
     parts = _get_matcher_parts(obj)
     if parts:
+        matcher = _singleton_matchers.get(parts[0])
+        if matcher is not None:
+            return matcher
         return MatcherObject(*parts)
     return obj
 
 
+# Exact types that never need special handling. The float type is not
+# included because NaN values get a matcher.
+_plain_scalar_types = frozenset([str, bytes, int, complex, type(None)])
+
+
+# Map matcher types to the kind of slot they use in a generated tuple
+# comparison: 'f' calls the matcher's "_func" directly, 't' and 'n'
+# inline truthy and falsy checks, and 'w' (wildcard) is skipped. Any
+# other element is compared with the "==" operator--as a plain scalar
+# ('s') if its type is in _plain_scalar_types, else as a value ('v').
+_slot_kinds = {
+    MatcherObject: 'f',
+    _WildcardMatcher: 'w',
+    _TruthyMatcher: 't',
+    _FalsyMatcher: 'n',
+}
+
+# Estimated cost of checking each kind of slot. Generated comparisons
+# check cheaper slots first so that a row can be rejected before the
+# more expensive matchers are called. For 'f' slots, the cost depends
+# on the handler (see _handler_costs) and any other handler (usually a
+# user-defined function) is assumed to be the most expensive.
+_kind_costs = {'s': 0, 'w': 0, 't': 1, 'n': 1, 'v': 2}
+_handler_costs = {
+    _check_type: 2,
+    _check_nan: 2,
+    _check_set: 2,
+    _check_str_regex: 3,
+    _check_regex: 3,
+}
+_default_handler_cost = 4
+
+
+def _slot_cost(x, kind):
+    if kind == 'f':
+        func = x._func
+        func = getattr(func, 'func', func)  # <- Unwrap partial objects.
+        return _handler_costs.get(func, _default_handler_cost)
+    return _kind_costs[kind]
+
+
+_tuple_eq_factories = {}
+_tuple_eq_factories_maxsize = 1024
+
+
+def _build_tuple_eq_factory(shape, order):
+    """Generate and return a factory for MatcherTuple comparison
+    functions. The *shape* is a tuple with one slot kind per element
+    (see _slot_kinds) and *order* is a tuple of element indexes in the
+    order they should be checked.
+
+    The generated function compares each element in a single frame
+    (rather than making one __eq__() call per element) but otherwise
+    follows the same rules as tuple comparison: identical elements
+    always match and the matcher's own element is the left operand.
+    """
+    size = len(shape)
+    params = []
+    checks = {}
+    lines = [
+        '    def eq(other):',
+        '        if not isinstance(other, tuple):',
+        '            return NotImplemented',
+        '        if len(other) != {0}:'.format(size),
+        '            return False',
+    ]
+    if size:
+        names = ', '.join('o{0}'.format(i) for i in range(size))
+        lines.append('        {0}, = other'.format(names))
+
+    for i, kind in enumerate(shape):
+        if kind == 'w':
+            continue  # <- Wildcard matches everything, no check needed.
+        if kind == 'f':
+            params.extend(['m{0}'.format(i), 'f{0}'.format(i)])
+            condition = 'o{0} is m{0} or f{0}(o{0})'.format(i)
+        elif kind == 't':
+            condition = 'o{0}'.format(i)  # <- Matcher itself is truthy.
+        elif kind == 'n':
+            params.append('m{0}'.format(i))
+            condition = 'o{0} is m{0} or not o{0}'.format(i)
+        else:
+            params.append('v{0}'.format(i))
+            condition = 'o{0} is v{0} or v{0} == o{0}'.format(i)
+        checks[i] = condition
+
+    for i in order:
+        if i in checks:
+            lines.append('        if not ({0}):'.format(checks[i]))
+            lines.append('            return False')
+
+    lines.append('        return True')
+    lines.append('    return eq')
+    lines.insert(0, 'def factory({0}):'.format(', '.join(params)))
+
+    namespace = {}
+    exec('\n'.join(lines), namespace)
+    return namespace['factory']
+
+
+def _make_tuple_eq(matcher):
+    """Return a function that compares *matcher* (a MatcherTuple)
+    against another tuple.
+    """
+    shape = tuple(
+        _slot_kinds.get(type(x))
+        or ('s' if type(x) in _plain_scalar_types else 'v')
+        for x in matcher
+    )
+    costs = [_slot_cost(x, kind) for x, kind in zip(matcher, shape)]
+    order = tuple(sorted(range(len(shape)), key=costs.__getitem__))
+
+    key = (shape, order)
+    factory = _tuple_eq_factories.get(key)
+    if factory is None:
+        factory = _build_tuple_eq_factory(shape, order)
+        if len(_tuple_eq_factories) >= _tuple_eq_factories_maxsize:
+            _tuple_eq_factories.clear()
+        _tuple_eq_factories[key] = factory
+
+    args = []
+    for x, kind in zip(matcher, shape):
+        if kind == 'f':
+            args.extend([x, x._func])
+        elif kind not in ('t', 'w'):
+            args.append(x)
+    return factory(*args)
+
+
+def _get_tuple_matcher(obj):
+    for index, x in enumerate(obj):
+        if type(x) in _plain_scalar_types:
+            continue
+        m = _get_matcher_or_original(x)
+        if m is not x or isinstance(m, MatcherBase):
+            break
+    else:
+        return obj  # <- Orignal reference (no matchers needed).
+
+    # Only build a new sequence once a matcher has been found.
+    matcher = list(obj[:index])
+    matcher.append(m)
+    matcher.extend(_get_matcher_or_original(x) for x in obj[index + 1:])
+    return MatcherTuple(matcher)  # <- Wrapper.
+
+
 def get_matcher(obj):
     """Return an object suitable for comparing against other objects
     using the "==" operator.
@@ -157,6 +478,13 @@ def get_matcher(obj):
     MatcherTuple will be returned. If the object is already suitable
     for this purpose, the original object will be returned unchanged.
     """
+    obj_type = type(obj)
+    if obj_type in _plain_scalar_types:
+        return obj  # <- EXIT! (Compared with "==" as-is.)
+
+    if obj_type is tuple:
+        return _get_tuple_matcher(obj)  # <- EXIT! (Exact type, skip checks.)
+
     if isinstance(obj, MatcherBase):
         return obj  # <- EXIT!
 
@@ -164,11 +492,7 @@ def get_matcher(obj):
         return obj.matcher  # <- EXIT!
 
     if isinstance(obj, tuple):
-        matcher = tuple(_get_matcher_or_original(x) for x in obj)
-        for x in matcher:
-            if isinstance(x, MatcherBase):
-                return MatcherTuple(matcher)  # <- Wrapper.
-        return obj  # <- Orignal reference.
+        return _get_tuple_matcher(obj)  # <- EXIT!
 
     return _get_matcher_or_original(obj)
 
@@ -198,7 +522,8 @@ class Predicate(object):
     +-------------------------+-----------------------------------+
     | str or non-container    | value is equal to the object      |
     +-------------------------+-----------------------------------+
-    | set                     | value is a member of the set      |
+    | set, frozenset, or      | value is a member of the set      |
+    | other abc.Set type      |                                   |
     +-------------------------+-----------------------------------+
     | tuple of predicates     | tuple of values satisfies         |
     |                         | corresponding tuple of            |
@@ -292,6 +617,8 @@ class Predicate(object):
             pred.__name__
         AttributeError: 'Predicate' object has no attribute '__name__'
     """
+    __slots__ = ('obj', 'matcher', '_inverted', '__name__', '__weakref__')
+
     def __init__(self, obj, name=None):
         if isinstance(obj, Predicate):
             self.obj = obj.obj
@@ -1,8 +1,15 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import sys
+import types
 import unittest
 import re
+from functools import partial
 
+try:
+    import regex
+except ImportError:
+    regex = None
 
 try:
     unittest.TestCase.assertRaisesRegex  # Renamed in Python 3
@@ -19,6 +26,7 @@ from predicate import (
     _check_falsy,
     _check_nan,
     _check_regex,
+    _check_str_regex,
     _check_set,
     _get_matcher_parts,
     get_matcher,
@@ -130,6 +138,45 @@ class TestCheckRegex(unittest.TestCase):
         regex = re.compile('abc')
         self.assertTrue(_check_regex(regex, regex))
 
+    def test_str_pattern(self):
+        regex = re.compile('abc')
+        self.assertTrue(_check_str_regex(regex, 'xabcx'))
+        self.assertFalse(_check_str_regex(regex, 'xyz'))
+        self.assertFalse(_check_str_regex(regex, 123))
+        self.assertFalse(_check_str_regex(regex, b'abc'))
+        self.assertTrue(_check_str_regex(regex, regex))
+
+    def test_bytes_pattern(self):
+        pred_handler, _ = _get_matcher_parts(re.compile(b'abc'))
+        self.assertTrue(pred_handler(b'xabcx'))
+        self.assertTrue(pred_handler(bytearray(b'abc')))
+        self.assertFalse(pred_handler('abc'))
+
+    @unittest.skipIf(not regex, 'regex not found')
+    def test_regex_package(self):
+        pattern = regex.compile('(Ch|H)ann?ukk?ah?')
+        pred_handler, repr_string = _get_matcher_parts(pattern)
+        self.assertTrue(pred_handler('Happy Hanukkah'))
+        self.assertFalse(pred_handler('Merry Christmas'))
+        self.assertFalse(pred_handler(123))
+        self.assertEqual(repr_string, "regex.compile('(Ch|H)ann?ukk?ah?')")
+
+    def test_other_regex_module(self):
+        """A module named "regex" that has no Pattern type (a local
+        regex.py file, an old release, etc.) should be ignored.
+        """
+        original = sys.modules.get('regex')
+        sys.modules['regex'] = types.ModuleType('regex')
+        try:
+            class MyObject(object):
+                pass
+            self.assertIsNone(_get_matcher_parts(MyObject()))
+        finally:
+            if original is None:
+                del sys.modules['regex']
+            else:
+                sys.modules['regex'] = original
+
 
 class TestCheckSet(unittest.TestCase):
     def test_function(self):
@@ -140,6 +187,8 @@ class TestCheckSet(unittest.TestCase):
     def test_whole_set_equality(self):
         function = lambda x: _check_set(set(['abc', 'def']), x)
         self.assertTrue(function(set(['abc', 'def'])))
+        self.assertTrue(function(frozenset(['abc', 'def'])))
+        self.assertTrue(function({'abc': 1, 'def': 2}.keys()))
 
     def test_unhashable_check(self):
         function = lambda x: _check_set(set(['abc', 'def']), x)
@@ -168,6 +217,21 @@ class TestGetMatcherParts(unittest.TestCase):
         self.assertFalse(pred_handler(2))
         self.assertEqual(repr_string, '<lambda>')
 
+    def test_other_callables(self):
+        pred_handler, repr_string = _get_matcher_parts(str.isdigit)
+        self.assertTrue(pred_handler('123'))
+        self.assertEqual(repr_string, 'isdigit')
+
+        pred_handler, repr_string = _get_matcher_parts('abc'.startswith)
+        self.assertTrue(pred_handler('a'))
+        self.assertFalse(pred_handler('b'))
+        self.assertEqual(repr_string, 'startswith')
+
+        pred_handler, repr_string = _get_matcher_parts(len)
+        self.assertTrue(pred_handler('a'))
+        self.assertFalse(pred_handler(''))
+        self.assertEqual(repr_string, 'len')
+
     def test_ellipsis_wildcard(self):
         pred_handler, repr_string = _get_matcher_parts(Ellipsis)
         self.assertIs(pred_handler, _check_wildcard)
@@ -203,16 +267,205 @@ class TestGetMatcherParts(unittest.TestCase):
         self.assertFalse(pred_handler('b'))
         self.assertEqual(repr_string, repr(myset))
 
+    def test_frozenset(self):
+        myset = frozenset(['a'])
+        pred_handler, repr_string = _get_matcher_parts(myset)
+        self.assertTrue(pred_handler('a'))
+        self.assertFalse(pred_handler('b'))
+        self.assertEqual(repr_string, repr(myset))
+
+    def test_other_set_types(self):
+        keys = {'a': 1, 'b': 2}.keys()
+        pred_handler, repr_string = _get_matcher_parts(keys)
+        self.assertTrue(pred_handler('a'))
+        self.assertFalse(pred_handler('c'))
+        self.assertFalse(pred_handler(['a']))  # <- Unhashable.
+        self.assertEqual(repr_string, repr(keys))
+
+        # Whole-set equality with other set types.
+        self.assertTrue(pred_handler({'a': 3, 'b': 4}.keys()))
+        self.assertTrue(pred_handler(set(['a', 'b'])))
+        self.assertFalse(pred_handler({'a': 3}.keys()))
+
     def test_no_special_handling(self):
         self.assertIsNone(_get_matcher_parts(1))
         self.assertIsNone(_get_matcher_parts(0))
 
+    def test_subclasses(self):
+        """Subclasses of dispatched types should be handled the same
+        as their parent types.
+        """
+        class MyFloat(float):
+            pass
+
+        class MySet(set):
+            pass
+
+        class MyStr(str):
+            pass
+
+        pred_handler, repr_string = _get_matcher_parts(MyFloat('nan'))
+        self.assertIs(pred_handler, _check_nan)
+
+        pred_handler, repr_string = _get_matcher_parts(MySet(['a']))
+        self.assertTrue(pred_handler('a'))
+        self.assertFalse(pred_handler('b'))
+
+        self.assertIsNone(_get_matcher_parts(MyStr('a')))
+
+    def test_cached_parts(self):
+        regex = re.compile('ab[cd]')
+        handler, repr_string = _get_matcher_parts(regex)
+        self.assertIs(_get_matcher_parts(regex)[0], handler)
+        self.assertIs(_get_matcher_parts(regex)[1], repr_string)
+
+        myset = set(['a'])  # <- Mutable, should not be cached.
+        _, repr_string = _get_matcher_parts(myset)
+        myset.add('b')
+        _, repr_string = _get_matcher_parts(myset)
+        self.assertEqual(repr_string, repr(myset))
+
+    def test_cached_objects_released(self):
+        import gc
+        import weakref
+
+        def userfunc(x):
+            return True
+
+        userfunc_ref = weakref.ref(userfunc)
+        matcher = get_matcher(userfunc)
+        self.assertIs(get_matcher(userfunc)._func, matcher._func)  # <- Cached.
+        del matcher, userfunc
+        gc.collect()
+        self.assertIsNone(userfunc_ref())  # <- Not kept alive by the cache.
+
+    def test_bound_methods_not_cached(self):
+        import gc
+        import weakref
+
+        class MyClass(object):
+            def ok(self, value):
+                return True
+
+        instance = MyClass()
+        instance_ref = weakref.ref(instance)
+        _get_matcher_parts(instance.ok)
+        _get_matcher_parts(partial(MyClass.ok, instance))
+        del instance
+        gc.collect()
+        self.assertIsNone(instance_ref())  # <- Not kept alive by a cache.
+
 
 class TestMatcherInheritance(unittest.TestCase):
     def test_inheritance(self):
         self.assertTrue(issubclass(MatcherTuple, MatcherBase))
         self.assertTrue(issubclass(MatcherObject, MatcherBase))
 
+    def test_hashable(self):
+        for obj in [str, re.compile('abc'), Ellipsis, True, False]:
+            matcher = get_matcher(obj)
+            registry = {matcher: 'value'}
+            self.assertEqual(registry[matcher], 'value')
+
+    def test_hashed_by_identity(self):
+        matcher = get_matcher(str)
+        self.assertTrue(matcher == 'abc')
+        self.assertNotIn('abc', set([matcher]))  # <- Lookup is not a match.
+        self.assertIn(matcher, set([matcher]))
+
+        other = get_matcher(str)  # <- Separate matcher for the same type.
+        self.assertEqual(len(set([matcher, other])), 2)
+
+        # Shared matchers are the same object so they hash the same.
+        wildcards = set([get_matcher(Ellipsis), get_matcher(Ellipsis)])
+        self.assertEqual(len(wildcards), 1)
+
+    def test_slots(self):
+        for obj in [str, Ellipsis, True, False]:
+            matcher = get_matcher(obj)
+            with self.assertRaises(AttributeError):
+                object.__getattribute__(matcher, '__dict__')  # <- No instance dict.
+
+
+class TestMatcherTuple(unittest.TestCase):
+    def test_tuple_semantics(self):
+        matcher = get_matcher(('abc', int))
+        self.assertTrue(matcher == ('abc', 1))
+        self.assertFalse(matcher != ('abc', 1))
+        self.assertFalse(matcher == ('abc', 1, 2))  # <- Different length.
+        self.assertFalse(matcher == ['abc', 1])     # <- Not a tuple.
+        self.assertTrue(matcher != ['abc', 1])
+        self.assertTrue(matcher == matcher)
+        self.assertEqual(hash(matcher), hash(tuple(matcher)))
+
+    def test_unwrapped_scalars(self):
+        """Elements without special handling should be stored as-is
+        so they are compared directly with the "==" operator.
+        """
+        value = 'abc'
+        matcher = get_matcher((value, 123, None, int))
+        self.assertIs(matcher[0], value)
+        self.assertEqual(matcher[1:3], (123, None))
+        self.assertIsInstance(matcher[3], MatcherObject)
+
+    def test_truthy_and_falsy_slots(self):
+        matcher = get_matcher((True, False, 'abc'))
+        self.assertTrue(matcher == (1, 0, 'abc'))
+        self.assertTrue(matcher == ('x', '', 'abc'))
+        self.assertFalse(matcher == (0, 0, 'abc'))
+        self.assertFalse(matcher == (1, 1, 'abc'))
+        self.assertTrue(matcher == matcher)  # <- Identical elements match.
+
+    def test_scalars_checked_first(self):
+        calls = []
+        def isodd(x):  # <- Helper function.
+            calls.append(x)
+            return x % 2 == 1
+
+        matcher = get_matcher((isodd, 'abc'))
+        self.assertFalse(matcher == (3, 'xyz'))
+        self.assertEqual(calls, [])  # <- Scalar mismatch, isodd not called.
+
+        self.assertTrue(matcher == (3, 'abc'))
+        self.assertEqual(calls, [3])
+
+    def test_evaluation_order(self):
+        """Values are compared before callables even when the
+        callable comes first in the tuple.
+        """
+        class RaisesOnEq(object):
+            def __eq__(self, other):
+                raise ValueError('compared')
+
+        never = lambda x: False
+        matcher = get_matcher((never, RaisesOnEq()))
+        with self.assertRaises(ValueError):
+            matcher == ('a', 'b')  # <- Value compared before never().
+
+        # Plain tuple comparison stops at the first element instead.
+        self.assertFalse((never, RaisesOnEq()) == ('a', 'b'))
+
+    def test_cheaper_matchers_checked_first(self):
+        calls = []
+        def isodd(x):  # <- Helper function.
+            calls.append(x)
+            return x % 2 == 1
+
+        matcher = get_matcher((isodd, re.compile('abc'), set(['x', 'y'])))
+        self.assertFalse(matcher == (3, 'abc', 'z'))  # <- Set mismatch.
+        self.assertFalse(matcher == (3, 'xyz', 'x'))  # <- Regex mismatch.
+        self.assertEqual(calls, [])
+
+        self.assertTrue(matcher == (3, 'abc', 'x'))
+        self.assertEqual(calls, [3])
+
+    def test_copy(self):
+        import copy
+        matcher = get_matcher(('abc', Ellipsis))
+        copied = copy.copy(matcher)
+        self.assertIsInstance(copied, MatcherTuple)
+        self.assertTrue(copied == ('abc', 'xyz'))
+
 
 class TestGetMatcher(unittest.TestCase):
     def assertIsInstance(self, obj, cls, msg=None):  # New in Python 3.2.
@@ -245,6 +498,32 @@ class TestGetMatcher(unittest.TestCase):
         matcher = get_matcher(original)
         self.assertIs(matcher, original)
 
+    def test_shared_matchers(self):
+        """Wildcard, truthy, and falsy matchers should be reused."""
+        for obj, match, nonmatch in [(True, 1, 0), (False, 0, 1)]:
+            matcher = get_matcher(obj)
+            self.assertIs(matcher, get_matcher(obj))
+            self.assertIsInstance(matcher, MatcherObject)
+            self.assertTrue(matcher == match)
+            self.assertFalse(matcher == nonmatch)
+            self.assertTrue(matcher != nonmatch)
+
+        matcher = get_matcher(Ellipsis)
+        self.assertIs(matcher, get_matcher(Ellipsis))
+        self.assertTrue(matcher == 0)
+        self.assertFalse(matcher != 0)
+
+    def test_tuple_contents_not_retained(self):
+        import gc
+        import weakref
+
+        myset = set(['x'])
+        myset_ref = weakref.ref(myset)
+        matcher = get_matcher(('abc', myset))
+        del matcher, myset
+        gc.collect()
+        self.assertIsNone(myset_ref())  # <- Not kept alive by a cache.
+
     def test_get_matcher_from_matcher(self):
         original = get_matcher((1, 'abc'))
         matcher = get_matcher(original)
@@ -338,6 +617,17 @@ class TestPredicate(unittest.TestCase):
         pred5 = Predicate(pred3, name='pred5_name')  # <- Overrides pred3 name.
         self.assertEqual(pred5.__name__, 'pred5_name')
 
+    def test_slots(self):
+        pred = Predicate('abc', name='pred_name')
+        with self.assertRaises(AttributeError):
+            object.__getattribute__(pred, '__dict__')  # <- No instance dict.
+        self.assertEqual(Predicate.__name__, 'Predicate')
+
+    def test_weakref(self):
+        import weakref
+        pred = Predicate('abc')
+        self.assertIs(weakref.ref(pred)(), pred)
+
     def test_str(self):
         pred = Predicate('abc')
         self.assertEqual(str(pred), "'abc'")
@@ -87,6 +87,8 @@ class RepeatingContainerBase(Iterable):
         >>> super(RepeatingContainer, repeating1).__eq__(repeating2)
         True
     """
+    __slots__ = ()
+
     def __eq__(self, other):
         return (isinstance(other, RepeatingContainer)
                 and self._objs == other._objs
@@ -137,6 +139,8 @@ class RepeatingContainer(RepeatingContainerBase):
         >>> dict(repeating)
         {'a': 'FOO', 'b': 'BAR'}
     """
+    __slots__ = ('_keys', '_objs', '__weakref__')
+
     def __init__(self, iterable):
         if not isinstance(iterable, Iterable):
             msg = '{0!r} object is not iterable'
@@ -192,11 +196,22 @@ class RepeatingContainer(RepeatingContainerBase):
 
         return '{0}({1}{2}{3})'.format(cls_name, begin, internal_repr, end)
 
-    def __getattr__(self, name):
-        repeating = self.__class__(getattr(obj, name) for obj in self._objs)
+    def _derive(self, objs):
+        """Return a new RepeatingContainer of the same class that
+        contains *objs* (a list of values) and uses the same keys as
+        the original.
+
+        Since *objs* come from the original container's own contents,
+        the validation in __init__() is skipped.
+        """
+        repeating = self.__class__.__new__(self.__class__)
         repeating._keys = self._keys
+        repeating._objs = tuple(objs)
         return repeating
 
+    def __getattr__(self, name):
+        return self._derive([getattr(obj, name) for obj in self._objs])
+
     def _compatible_container(self, value):
         """Returns True if *value* is a RepeatingContainer with
         compatible contents.
@@ -269,14 +284,12 @@ class RepeatingContainer(RepeatingContainerBase):
             # Call each object using args and kwds from the expanded list.
             expanded_list = self._expand_args_kwds(*args, **kwds)
             zipped = zip(self._objs, expanded_list)
-            iterable = (obj(*a, **k) for (obj, (a, k)) in zipped)
+            objs = [obj(*a, **k) for (obj, (a, k)) in zipped]
         else:
             # Call each object with the same args and kwds.
-            iterable = (obj(*args, **kwds) for obj in self._objs)
+            objs = [obj(*args, **kwds) for obj in self._objs]
 
-        repeating = self.__class__(iterable)
-        repeating._keys = self._keys
-        return repeating
+        return self._derive(objs)
 
 
 def _setup_RepeatingContainer_special_names(repeating_class):
@@ -295,9 +308,7 @@ def _setup_RepeatingContainer_special_names(repeating_class):
     """.split()
 
     def repeating_getattr(self, name):
-        repeating = self.__class__(getattr(obj, name) for obj in self._objs)
-        repeating._keys = self._keys
-        return repeating
+        return self._derive([getattr(obj, name) for obj in self._objs])
 
     for name in special_names:
         dunder = '__{0}__'.format(name)
@@ -317,9 +328,7 @@ def _setup_RepeatingContainer_special_names(repeating_class):
     def repeating_reflected_method(self, other, name):
         unreflected_op = name[1:]  # Slice-off 'r' prefix.
         operation = getattr(operator, unreflected_op)
-        repeating = self.__class__(operation(other, obj) for obj in self._objs)
-        repeating._keys = self._keys
-        return repeating
+        return self._derive([operation(other, obj) for obj in self._objs])
 
     for name in reflected_special_names:
         dunder = '__{0}__'.format(name)
@@ -42,6 +42,16 @@ class TestRepeatingContainer(unittest.TestCase):
         with self.assertRaises(ValueError):
             RepeatingContainer('abc')
 
+    def test_slots(self):
+        group = RepeatingContainer([1, 2, 3])
+        with self.assertRaises(AttributeError):
+            object.__getattribute__(group, '__dict__')  # <- No instance dict.
+
+    def test_weakref(self):
+        import weakref
+        group = RepeatingContainer([1, 2, 3])
+        self.assertIs(weakref.ref(group)(), group)
+
     def test_iter_sequence(self):
         group = RepeatingContainer([1, 2, 3])
         self.assertIsInstance(iter(group), Iterator)